@@ -17,13 +17,25 @@
 # ***** END GPL LICENSE BLOCK *****
 import pathlib
 import random
+import sys
 import tempfile
+import time
 
 import aud
 import bpy
 import math
+import numpy
+
+# blender --python does not add the script's folder to the module search
+# path, inside the .blend quality is imported from the quality.py text block
+SCRIPT_DIR = str(pathlib.Path(__file__).resolve().parent)
+if SCRIPT_DIR not in sys.path:
+    sys.path.append(SCRIPT_DIR)
+
+from quality import QualityGovernor, ViewportQuality  # noqa: E402
 
 AUD_DEVICE = aud.Device()
+UPDATE_RATE = 1 / 30
 SOUND_FILES = {}
 TMPDIR = tempfile.TemporaryDirectory()
 
@@ -99,6 +111,7 @@ class Ball:
         self.sound_hit = aud.Sound.file(SOUND_FILES['hit'])
         self.sound_spawn = aud.Sound.file(SOUND_FILES['hit2'])
 
+        self.blender_object = blender_object
         self.dimensions = blender_object.dimensions
         self.lasers = spawn_laser_objects
 
@@ -116,6 +129,8 @@ class Ball:
         self.direction = [0, 0, 0]
         self.position = [0, 0, 0]
         self.game: 'PongGame' = None
+        self.muted = False
+        self.random = random.Random()
         self.bound_glow_control = glow_control_object.scale
 
     def spawn(self, speed):
@@ -126,15 +141,15 @@ class Ball:
         self.speed = speed
         self._set_new_position(
             (
-                self.spawn_jitter[0] * (random.random() - 0.5),
+                self.spawn_jitter[0] * (self.random.random() - 0.5),
                 20,
-                self.spawn_jitter[2] * (random.random() - 0.5),
+                self.spawn_jitter[2] * (self.random.random() - 0.5),
             )
         )
 
-        self.direction[0] = random.choice(self.direction_choices)
+        self.direction[0] = self.random.choice(self.direction_choices)
         self.direction[1] = -1
-        self.direction[2] = random.choice(self.direction_choices)
+        self.direction[2] = self.random.choice(self.direction_choices)
         self._apply_normalization(self.direction)
         self._apply_factor(self.direction, speed)
 
@@ -218,6 +233,8 @@ class Ball:
         obstacle.on_hit()
 
     def _play_sound(self, sound, distance_reference):
+        if self.muted:
+            return
         handle = AUD_DEVICE.play(sound)
         handle.location = tuple(self.bound_location)
         handle.distance_reference = distance_reference
@@ -302,6 +319,7 @@ class Mover:
         self._visible = True
         self._glow = False
         self.sound = aud.Sound.file(SOUND_FILES['hit2'])
+        self.muted = False
 
         self.command_map = {
             self.CMD_UP: self._increase_z,
@@ -323,11 +341,16 @@ class Mover:
 
     def on_hit(self):
         self.resize(0.8)
-        handle = AUD_DEVICE.play(self.sound)
-        handle.location = tuple(self.bound_location)
-        handle.distance_reference = 15
+        self._play_sound(self.sound, 15)
         self.glow = True
 
+    def _play_sound(self, sound, distance_reference):
+        if self.muted:
+            return
+        handle = AUD_DEVICE.play(sound)
+        handle.location = tuple(self.bound_location)
+        handle.distance_reference = distance_reference
+
     def resize(self, factor):
         self.bound_scale[0] = factor * self.bound_scale[0]
         self.bound_scale[2] = factor * self.bound_scale[2]
@@ -482,6 +505,8 @@ class PongGame:
         self.has_mover_been_hit = False
         self.score_factor = self.INITIAL_SCORE_FACTOR
         self._score = 0
+        self.goals_hit = 0
+        self.movers_missed = 0
 
         self.command_for_key_type = {
             'LEFT_ARROW': Mover.CMD_LEFT,
@@ -530,13 +555,28 @@ class PongGame:
             self.ball.update(time_delta)
             self.play_area.update(time_delta)
 
+    @property
+    def muted(self):
+        return self.ball.muted and self.mover.muted
+
+    @muted.setter
+    def muted(self, value):
+        self.ball.muted = value
+        self.mover.muted = value
+
+    @property
+    def is_game_over(self):
+        return self._is_game_over
+
     def mover_missed(self):
+        self.movers_missed += 1
         if self.has_mover_been_hit:
             self.new_round(ball_speed_factor=1.2, mover_speed_factor=1.1)
         else:
             self.game_over()
 
     def goal_hit(self):
+        self.goals_hit += 1
         self.has_mover_been_hit = True
         self.score += self.score_factor
 
@@ -558,16 +598,140 @@ class PongGame:
             action(self.command_for_key_type[event.type])
 
 
+class PongVecEnv:
+    """Steps a batch of games for training an AI player.
+
+    Observations, rewards and done flags are written into buffers
+    allocated once, ``reset`` and ``step`` return those same arrays.
+    An action is one of the ``Mover.CMD_*`` commands or ``ACTION_NONE``.
+
+    Games that end are restarted within the same ``step``, so their row in
+    ``observations`` already belongs to the new game. The observation the
+    game ended with is kept in ``final_observations`` for rows whose done
+    flag is set.
+
+    Games are muted while in the environment, unless ``muted`` is False.
+
+    Every game needs its own mover and ball objects: the mover size and
+    dimensions used for collisions are read from the Blender object, so
+    games sharing one would affect each other. The .blend only contains
+    one set, more have to be added for a batch of several games.
+    """
+    ACTION_NONE = -1
+    VALID_ACTIONS = frozenset((
+        ACTION_NONE,
+        Mover.CMD_UP, Mover.CMD_DOWN, Mover.CMD_LEFT, Mover.CMD_RIGHT,
+    ))
+    OBSERVATION_SIZE = 8
+    GOAL_REWARD = 1.0
+    MISS_REWARD = -1.0
+
+    def __init__(self, games, time_delta=UPDATE_RATE, muted=True):
+        self.games = tuple(games)
+        self._check_distinct_objects(self.games)
+        self.time_delta = time_delta
+        for game in self.games:
+            game.muted = muted
+        n_envs = len(self.games)
+        self.observations = numpy.zeros(
+            (n_envs, self.OBSERVATION_SIZE), dtype=numpy.float32)
+        self.final_observations = numpy.zeros(
+            (n_envs, self.OBSERVATION_SIZE), dtype=numpy.float32)
+        self.rewards = numpy.zeros(n_envs, dtype=numpy.float32)
+        self.dones = numpy.zeros(n_envs, dtype=numpy.bool_)
+        self._goals_hit = [0] * n_envs
+        self._movers_missed = [0] * n_envs
+
+    @property
+    def n_envs(self):
+        return len(self.games)
+
+    @staticmethod
+    def _check_distinct_objects(games):
+        objects = [game.mover.blender_object for game in games]
+        objects += [game.ball.blender_object for game in games]
+        if len({id(bl_object) for bl_object in objects}) != len(objects):
+            raise ValueError(
+                "every game needs its own mover and ball objects")
+
+    def reset(self, seed=None):
+        for index, game in enumerate(self.games):
+            if seed is not None:
+                game.ball.random.seed(seed + index)
+            self._reset_game(index, game)
+            self._write_observation(self.observations, index, game)
+        self.rewards[:] = 0
+        self.dones[:] = False
+        return self.observations
+
+    def step(self, actions):
+        if len(actions) != self.n_envs:
+            raise ValueError(
+                f"expected {self.n_envs} actions, got {len(actions)}")
+        for action in actions:
+            if action not in self.VALID_ACTIONS:
+                raise ValueError(f"invalid action {action}")
+
+        for index, (game, action) in enumerate(zip(self.games, actions)):
+            self._set_action(game.mover, action)
+            game.update(self.time_delta)
+
+            goals_hit = game.goals_hit - self._goals_hit[index]
+            movers_missed = game.movers_missed - self._movers_missed[index]
+            self.rewards[index] = (
+                goals_hit * self.GOAL_REWARD
+                + movers_missed * self.MISS_REWARD
+            )
+            self._goals_hit[index] = game.goals_hit
+            self._movers_missed[index] = game.movers_missed
+
+            done = game.is_game_over
+            self.dones[index] = done
+            if done:
+                self._write_observation(self.final_observations, index, game)
+                self._reset_game(index, game)
+            self._write_observation(self.observations, index, game)
+
+        return self.observations, self.rewards, self.dones
+
+    def _reset_game(self, index, game):
+        game.mover.active_commands.clear()
+        game.new_game()
+        self._goals_hit[index] = game.goals_hit
+        self._movers_missed[index] = game.movers_missed
+
+    def _set_action(self, mover, action):
+        mover.active_commands.clear()
+        if action != self.ACTION_NONE:
+            mover.start_command(int(action))
+
+    @staticmethod
+    def _write_observation(buffer, index, game):
+        observation = buffer[index]
+        mover_position = game.mover.position
+        ball_position = game.ball.position
+        ball_direction = game.ball.direction
+        observation[0] = mover_position[0]
+        observation[1] = mover_position[2]
+        observation[2] = ball_position[0]
+        observation[3] = ball_position[1]
+        observation[4] = ball_position[2]
+        observation[5] = ball_direction[0]
+        observation[6] = ball_direction[1]
+        observation[7] = ball_direction[2]
+
+
 class PongHandler(bpy.types.Operator):
     bl_idname = "wm.pong_handler"
     bl_label = "Pong Handler"
-    update_rate = 1 / 30
+    update_rate = UPDATE_RATE
     _loading_screen_obj = bpy.data.objects['loading']
     _game_collection = bpy.data.collections['area']
     _waiting_timer = 8
     _modal_action = None
     _timer = None
     game = None
+    governor = None
 
     def execute(self, context):
         wm = context.window_manager
@@ -585,6 +749,8 @@ class PongHandler(bpy.types.Operator):
             return {'CANCELLED'}
 
         elif event.type == 'TIMER':
+            if self.governor is not None:
+                self.governor.on_timer(time.perf_counter())
             self._modal_action()
 
         elif self.game is not None:
@@ -617,6 +783,8 @@ class PongHandler(bpy.types.Operator):
         )
 
         self.game = game
+        self.governor = QualityGovernor(
+            ViewportQuality(bpy.context.scene), self.update_rate)
         self._loading_screen_obj.hide_viewport = True
         self._game_collection.hide_viewport = False
 
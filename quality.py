@@ -0,0 +1,180 @@
+# ***** BEGIN GPL LICENSE BLOCK *****
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software Foundation,
+# Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301, USA.
+#
+# ***** END GPL LICENSE BLOCK *****
+
+PIXEL_SIZES = ('1', '2', '4', '8')
+
+
+def _coarser_pixel_size(authored, size):
+    if authored in PIXEL_SIZES and int(authored) >= int(size):
+        return authored
+    return size
+
+
+class ViewportQuality:
+    """Quality levels for the Eevee viewport of a scene.
+
+    Level 0 are the settings the scene was authored with, every further
+    level only lowers them.
+    """
+    EEVEE_SETTINGS = (
+        'taa_samples', 'use_bloom', 'use_ssr', 'use_gtao', 'use_soft_shadows'
+    )
+
+    def __init__(self, scene):
+        self.bound_eevee = scene.eevee
+        self.bound_render = scene.render
+
+        authored = {
+            name: getattr(self.bound_eevee, name)
+            for name in self.EEVEE_SETTINGS
+        }
+        authored['pixel_size'] = self.bound_render.preview_pixel_size
+        self.levels = (
+            authored,
+            dict(authored,
+                 taa_samples=min(authored['taa_samples'], 8),
+                 use_ssr=False),
+            dict(authored,
+                 taa_samples=min(authored['taa_samples'], 4),
+                 use_ssr=False, use_gtao=False, use_soft_shadows=False),
+            dict(authored,
+                 taa_samples=min(authored['taa_samples'], 2),
+                 use_ssr=False, use_gtao=False, use_soft_shadows=False,
+                 pixel_size=_coarser_pixel_size(authored['pixel_size'], '2')),
+            dict(authored,
+                 taa_samples=1,
+                 use_bloom=False, use_ssr=False, use_gtao=False,
+                 use_soft_shadows=False,
+                 pixel_size=_coarser_pixel_size(authored['pixel_size'], '4')),
+        )
+
+    @property
+    def n_levels(self):
+        return len(self.levels)
+
+    def apply_level(self, level):
+        settings = self.levels[level]
+        for name in self.EEVEE_SETTINGS:
+            setattr(self.bound_eevee, name, settings[name])
+        self.bound_render.preview_pixel_size = settings['pixel_size']
+
+
+class QualityGovernor:
+    """Steps the viewport quality down when frames arrive late and back up
+    again once they arrive on time.
+
+    Frames are driven by a timer with period ``frame_period``, so the
+    measured interval never drops much below it: quality is lowered when
+    the smoothed interval exceeds the period by more than
+    ``lower_tolerance`` and raised when it stays within
+    ``raise_tolerance`` of the period.
+
+    An on time interval cannot tell how much headroom is left, so raising
+    is a probe. A probe undone within ``probe_frames`` doubles the wait
+    before the next one, up to ``max_frames_to_raise``; a probe that holds
+    resets it. The first ``settle_frames`` intervals after each change are
+    ignored, they include the redraw and shader compilation the change
+    itself causes.
+
+    The viewport only needs an ``n_levels`` attribute and an
+    ``apply_level(level)`` method, level 0 being the highest quality and
+    the one already active.
+    """
+
+    def __init__(self, viewport, frame_period, lower_tolerance=0.15,
+                 raise_tolerance=0.05, smoothing=0.2,
+                 frames_to_lower=10, frames_to_raise=150,
+                 max_frames_to_raise=4800, probe_frames=300,
+                 settle_frames=5):
+        self.viewport = viewport
+        self.frame_period = frame_period
+        self.lower_threshold = frame_period * (1 + lower_tolerance)
+        self.raise_threshold = frame_period * (1 + raise_tolerance)
+        self.smoothing = smoothing
+        self.frames_to_lower = frames_to_lower
+        self.min_frames_to_raise = frames_to_raise
+        self.max_frames_to_raise = max_frames_to_raise
+        self.probe_frames = probe_frames
+        self.settle_frames = settle_frames
+
+        self.level = 0
+        self.frame_time = frame_period
+        self.frames_to_raise = frames_to_raise
+        self._last_timestamp = None
+        self._slow_frames = 0
+        self._fast_frames = 0
+        self._settle_timer = 0
+        self._probe_timer = 0
+
+    def on_timer(self, timestamp):
+        last_timestamp = self._last_timestamp
+        self._last_timestamp = timestamp
+        if last_timestamp is not None:
+            self.add_frame_time(timestamp - last_timestamp)
+
+    def add_frame_time(self, frame_time):
+        if self._settle_timer > 0:
+            self._settle_timer -= 1
+            return
+
+        if self._probe_timer > 0:
+            self._probe_timer -= 1
+            if self._probe_timer == 0:
+                self.frames_to_raise = self.min_frames_to_raise
+
+        self.frame_time += self.smoothing * (frame_time - self.frame_time)
+
+        if self.frame_time > self.lower_threshold:
+            self._slow_frames += 1
+            self._fast_frames = 0
+        elif self.frame_time < self.raise_threshold:
+            self._fast_frames += 1
+            self._slow_frames = 0
+        else:
+            self._slow_frames = 0
+            self._fast_frames = 0
+
+        if self._slow_frames >= self.frames_to_lower:
+            self._lower()
+        elif self._fast_frames >= self.frames_to_raise:
+            self._raise()
+
+    def _lower(self):
+        if self._probe_timer > 0:
+            self._probe_timer = 0
+            self.frames_to_raise = min(
+                2 * self.frames_to_raise, self.max_frames_to_raise)
+        self._set_level(self.level + 1)
+
+    def _raise(self):
+        if self._set_level(self.level - 1):
+            self._probe_timer = self.probe_frames
+
+    def _set_level(self, level):
+        self._slow_frames = 0
+        self._fast_frames = 0
+        if not 0 <= level < self.viewport.n_levels or level == self.level:
+            return False
+
+        self.level = level
+        # the measured time belongs to the previous quality level
+        self.frame_time = self.frame_period
+        self.viewport.apply_level(level)
+        self._last_timestamp = None
+        self._settle_timer = self.settle_frames
+        return True
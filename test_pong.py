@@ -0,0 +1,132 @@
+import sys
+import types
+import unittest
+
+
+class FakeObject:
+    def __init__(self, dimensions=(1.0, 1.0, 1.0), location=(0.0, 0.0, 0.0)):
+        self.location = list(location)
+        self.scale = [1.0, 1.0, 1.0]
+        self.dimensions = dimensions
+        self.hide_viewport = False
+        self.modifiers = {'Array': types.SimpleNamespace(offset_u=0.0)}
+
+
+class FakeHandle:
+    location = (0, 0, 0)
+    distance_reference = 0
+
+
+class FakeDevice:
+    def __init__(self):
+        self.played = 0
+
+    def play(self, sound):
+        self.played += 1
+        return FakeHandle()
+
+    def stopAll(self):
+        pass
+
+
+sys.modules.setdefault('aud', types.SimpleNamespace(
+    Device=FakeDevice,
+    Sound=types.SimpleNamespace(file=lambda path: path),
+))
+sys.modules.setdefault('bpy', types.SimpleNamespace(
+    types=types.SimpleNamespace(Operator=object),
+    data=types.SimpleNamespace(
+        objects={'loading': FakeObject()},
+        collections={'area': FakeObject()},
+    ),
+))
+
+import numpy  # noqa: E402
+
+import pong  # noqa: E402
+
+pong.SOUND_FILES.update(hit='hit.wav', hit2='hit2.wav')
+
+
+def make_game():
+    play_area = pong.PlayArea((10.0, 50.0, 10.0), FakeObject())
+    mover = pong.Mover(
+        FakeObject((2.0, 0.2, 2.0), (0.0, -20.0, 0.0)), FakeObject(),
+        (FakeObject(), FakeObject(), FakeObject()),
+    )
+    ball = pong.Ball(
+        FakeObject((0.5, 0.5, 0.5)), FakeObject(),
+        (FakeObject(), FakeObject()), 6,
+    )
+    score_display = pong.ScoreDisplay([FakeObject() for _ in range(9)])
+    return pong.PongGame(play_area, mover, ball, score_display, FakeObject())
+
+
+class PongVecEnvTest(unittest.TestCase):
+    def setUp(self):
+        self.env = pong.PongVecEnv([make_game(), make_game()])
+        self.observations = self.env.reset(seed=0)
+        self.idle = [pong.PongVecEnv.ACTION_NONE] * self.env.n_envs
+
+    def step_until_done(self, index, max_steps=1000):
+        for _ in range(max_steps):
+            _, _, dones = self.env.step(self.idle)
+            if dones[index]:
+                return
+        self.fail("game did not end")
+
+    def test_returns_same_buffers(self):
+        self.assertIs(self.observations, self.env.observations)
+        for _ in range(3):
+            observations, rewards, dones = self.env.step(self.idle)
+            self.assertIs(observations, self.env.observations)
+            self.assertIs(rewards, self.env.rewards)
+            self.assertIs(dones, self.env.dones)
+
+    def test_miss_ends_game_with_negative_reward(self):
+        self.env.games[0].mover.position[0] = 100.0
+        self.step_until_done(0)
+        self.assertEqual(self.env.rewards[0], pong.PongVecEnv.MISS_REWARD)
+        self.assertFalse(self.env.games[0].is_game_over)
+
+    def test_goal_gives_positive_reward(self):
+        ball = self.env.games[1].ball
+        ball.position[1] = ball.ranges[1][1] + 1.0
+        _, rewards, dones = self.env.step(self.idle)
+        self.assertEqual(rewards[1], pong.PongVecEnv.GOAL_REWARD)
+        self.assertEqual(rewards[0], 0.0)
+        self.assertFalse(dones[1])
+
+    def test_keeps_final_observation_on_reset(self):
+        self.env.games[0].mover.position[0] = 100.0
+        self.step_until_done(0)
+        final_ball_y = self.env.final_observations[0, 3]
+        self.assertLess(final_ball_y, -20.0 - 42.0)
+        self.assertEqual(self.env.observations[0, 3], 20.0)
+
+    def test_seed_reproduces_observations(self):
+        other = pong.PongVecEnv([make_game(), make_game()])
+        numpy.testing.assert_array_equal(
+            other.reset(seed=0), self.observations)
+
+    def test_rejects_wrong_number_of_actions(self):
+        with self.assertRaises(ValueError):
+            self.env.step(self.idle[:1])
+
+    def test_rejects_invalid_action(self):
+        with self.assertRaises(ValueError):
+            self.env.step([pong.Mover.CMD_UP, 7])
+
+    def test_rejects_shared_objects(self):
+        game = make_game()
+        with self.assertRaises(ValueError):
+            pong.PongVecEnv([game, game])
+
+    def test_mutes_games(self):
+        played = pong.AUD_DEVICE.played
+        self.env.reset()
+        self.assertEqual(pong.AUD_DEVICE.played, played)
+
+
+if __name__ == '__main__':
+    unittest.main()
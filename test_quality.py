@@ -0,0 +1,159 @@
+import random
+import types
+import unittest
+
+from quality import QualityGovernor, ViewportQuality
+
+PERIOD = 1 / 30
+
+
+class FakeViewport:
+    n_levels = 5
+
+    def __init__(self):
+        self.applied = []
+
+    def apply_level(self, level):
+        self.applied.append(level)
+
+
+def feed(governor, intervals, start=0.0):
+    timestamp = start
+    governor.on_timer(timestamp)
+    for interval in intervals:
+        timestamp += interval
+        governor.on_timer(timestamp)
+    return timestamp
+
+
+class SimulatedMachine:
+    """Ticks a governor with intervals depending on its current level."""
+
+    def __init__(self, governor, interval_for_level, stall=0.0):
+        self.governor = governor
+        self.interval_for_level = interval_for_level
+        self.stall = stall
+        self.timestamp = 0.0
+        self.changes = []
+
+    def run(self, n_frames):
+        for _ in range(n_frames):
+            level = self.governor.level
+            self.timestamp += self.interval_for_level(level)
+            self.governor.on_timer(self.timestamp)
+            if self.governor.level != level:
+                self.changes.append(self.governor.level)
+                self.timestamp += self.stall
+
+
+class QualityGovernorTest(unittest.TestCase):
+    def setUp(self):
+        self.viewport = FakeViewport()
+        self.governor = QualityGovernor(self.viewport, PERIOD)
+
+    def lower_once(self):
+        machine = SimulatedMachine(
+            self.governor, lambda level: 2 * PERIOD if level == 0 else PERIOD)
+        while self.governor.level == 0:
+            machine.run(1)
+        return machine.timestamp
+
+    def test_keeps_authored_quality_at_start(self):
+        self.assertEqual(self.governor.level, 0)
+        self.assertEqual(self.viewport.applied, [])
+
+    def test_keeps_quality_when_on_time(self):
+        rng = random.Random(0)
+        feed(self.governor,
+             (PERIOD + rng.uniform(0, 0.002) for _ in range(900)))
+        self.assertEqual(self.governor.level, 0)
+        self.assertEqual(self.viewport.applied, [])
+
+    def test_lowers_when_late(self):
+        feed(self.governor, [2 * PERIOD] * 20)
+        self.assertEqual(self.viewport.applied[0], 1)
+
+    def test_raises_when_back_on_time(self):
+        end = self.lower_once()
+        feed(self.governor, [PERIOD] * 200, start=end)
+        self.assertEqual(self.governor.level, 0)
+
+    def test_no_change_within_tolerance_band(self):
+        end = self.lower_once()
+        feed(self.governor, [1.1 * PERIOD] * 900, start=end)
+        self.assertEqual(self.governor.level, 1)
+
+    def test_ignores_stall_after_change(self):
+        end = self.lower_once()
+        intervals = [2.0] + [PERIOD] * 100
+        feed(self.governor, intervals, start=end)
+        self.assertEqual(self.viewport.applied, [1])
+
+    def test_settles_when_each_change_stalls(self):
+        machine = SimulatedMachine(
+            self.governor,
+            lambda level: 2 * PERIOD if level == 0 else PERIOD,
+            stall=2.0,
+        )
+        machine.run(30 * 60)
+        self.assertNotIn(2, machine.changes)
+
+    def test_backs_off_raising_on_borderline_machine(self):
+        machine = SimulatedMachine(
+            self.governor, lambda level: 2 * PERIOD if level == 0 else PERIOD)
+        machine.run(30 * 60)
+        self.assertLessEqual(machine.changes.count(0), 3)
+
+        machine.changes.clear()
+        machine.run(30 * 60 * 10)
+        self.assertLessEqual(machine.changes.count(0), 5)
+        self.assertEqual(
+            self.governor.frames_to_raise, self.governor.max_frames_to_raise)
+
+    def test_keeps_raised_quality_when_probe_holds(self):
+        self.lower_once()
+        machine = SimulatedMachine(self.governor, lambda level: PERIOD)
+        machine.run(1000)
+        self.assertEqual(self.governor.level, 0)
+        self.assertEqual(
+            self.governor.frames_to_raise, self.governor.min_frames_to_raise)
+
+    def test_clamps_to_lowest_level(self):
+        feed(self.governor, [4 * PERIOD] * 1000)
+        self.assertEqual(self.governor.level, FakeViewport.n_levels - 1)
+        self.assertEqual(self.viewport.applied, [1, 2, 3, 4])
+
+    def test_clamps_to_highest_level(self):
+        feed(self.governor, [PERIOD] * 1000)
+        self.assertEqual(self.governor.level, 0)
+        self.assertEqual(self.viewport.applied, [])
+
+
+class ViewportQualityTest(unittest.TestCase):
+    def setUp(self):
+        self.scene = types.SimpleNamespace(
+            eevee=types.SimpleNamespace(
+                taa_samples=4, use_bloom=True, use_ssr=False,
+                use_gtao=True, use_soft_shadows=True,
+            ),
+            render=types.SimpleNamespace(preview_pixel_size='AUTO'),
+        )
+        self.viewport = ViewportQuality(self.scene)
+
+    def test_level_zero_restores_authored_settings(self):
+        self.viewport.apply_level(self.viewport.n_levels - 1)
+        self.viewport.apply_level(0)
+        self.assertEqual(self.scene.eevee.taa_samples, 4)
+        self.assertTrue(self.scene.eevee.use_gtao)
+        self.assertFalse(self.scene.eevee.use_ssr)
+        self.assertEqual(self.scene.render.preview_pixel_size, 'AUTO')
+
+    def test_levels_never_exceed_authored_settings(self):
+        for level in range(self.viewport.n_levels):
+            self.viewport.apply_level(level)
+            self.assertLessEqual(self.scene.eevee.taa_samples, 4)
+            self.assertFalse(self.scene.eevee.use_ssr)
+
+
+if __name__ == '__main__':
+    unittest.main()